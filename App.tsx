@@ -1,35 +1,70 @@
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useCallback, useEffect, useMemo, useRef } from 'react';
 import { analyzeContent, explainTerm } from './services/gemini';
+import { normalizeTerm, termCache } from './services/cache';
+import { prepareImage } from './services/image';
 import { AnalysisResult, TermExplanation } from './types';
 import AnalysisView from './components/AnalysisView';
 import TermModal from './components/TermModal';
 import Notebook from './components/Notebook';
 
+const loadNotebook = (): TermExplanation[] => {
+  try {
+    const saved = localStorage.getItem('mechmentor_notebook');
+    return saved ? JSON.parse(saved) : [];
+  } catch (err) {
+    console.error(err);
+    return [];
+  }
+};
+
 const App: React.FC = () => {
   const [view, setView] = useState<'home' | 'notebook'>('home');
   const [loading, setLoading] = useState(false);
   const [analysis, setAnalysis] = useState<AnalysisResult | null>(null);
   const [selectedTerm, setSelectedTerm] = useState<TermExplanation | null>(null);
   const [termLoading, setTermLoading] = useState(false);
-  const [savedTerms, setSavedTerms] = useState<TermExplanation[]>([]);
+  // Parsed once, before the first render, instead of in an effect that renders twice.
+  const [savedTerms, setSavedTerms] = useState<TermExplanation[]>(loadNotebook);
+  // Normalized terms with a cached explanation: seeded from the persistent cache,
+  // then extended as terms are explained this session.
+  const [explainedTerms, setExplainedTerms] = useState<Set<string>>(() => new Set());
 
   useEffect(() => {
-    const saved = localStorage.getItem('mechmentor_notebook');
-    if (saved) setSavedTerms(JSON.parse(saved));
+    termCache.cachedTerms().then(terms => setExplainedTerms(prev => new Set([...terms, ...prev])));
   }, []);
 
-  const saveToNotebook = (term: TermExplanation) => {
-    const updated = [...savedTerms.filter(t => t.term !== term.term), term];
-    setSavedTerms(updated);
-    localStorage.setItem('mechmentor_notebook', JSON.stringify(updated));
-  };
+  const readyTerms = useMemo(
+    () => new Set([...savedTerms.map(t => normalizeTerm(t.term)), ...explainedTerms]),
+    [savedTerms, explainedTerms]
+  );
 
-  const removeFromNotebook = (termName: string) => {
-    const updated = savedTerms.filter(t => t.term !== termName);
-    setSavedTerms(updated);
-    localStorage.setItem('mechmentor_notebook', JSON.stringify(updated));
-  };
+  // handleTermClick reads the notebook through this ref so its identity does not
+  // change whenever a term is saved or removed.
+  const savedTermsRef = useRef(savedTerms);
+
+  useEffect(() => {
+    // Nothing changed on mount; the notebook was just read from storage.
+    if (savedTermsRef.current === savedTerms) return;
+    savedTermsRef.current = savedTerms;
+    // A throw in an effect unmounts the app, so storage errors (private mode,
+    // quota) only cost persistence.
+    try {
+      localStorage.setItem('mechmentor_notebook', JSON.stringify(savedTerms));
+    } catch (err) {
+      console.warn("Could not save notebook", err);
+    }
+  }, [savedTerms]);
+
+  // Handlers passed to the memoized list views keep stable identities, so those
+  // views re-render only when their data changes, not on every loading toggle.
+  const saveToNotebook = useCallback((term: TermExplanation) => {
+    setSavedTerms(prev => [...prev.filter(t => t.term !== term.term), term]);
+  }, []);
+
+  const removeFromNotebook = useCallback((termName: string) => {
+    setSavedTerms(prev => prev.filter(t => t.term !== termName));
+  }, []);
 
   const handleFileUpload = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault();
@@ -41,24 +76,19 @@ const App: React.FC = () => {
 
     setLoading(true);
     try {
-      let textContent = '';
-      if (textFile.size) textContent = await textFile.text();
-
-      let imageObj;
-      if (imgFile.size) {
-        const reader = new FileReader();
-        const base64Promise = new Promise<string>((resolve) => {
-          reader.onload = () => resolve((reader.result as string).split(',')[1]);
-          reader.readAsDataURL(imgFile);
-        });
-        imageObj = {
-          data: await base64Promise,
-          mimeType: imgFile.type
-        };
-      }
+      // Reading the document and preparing the diagram are independent, so run both at once.
+      const [textContent, imageObj] = await Promise.all([
+        textFile.size ? textFile.text() : Promise.resolve(''),
+        imgFile.size ? prepareImage(imgFile) : Promise.resolve(undefined)
+      ]);
 
       const result = await analyzeContent(textContent || undefined, imageObj);
-      setAnalysis(result);
+      // Preview straight from the uploaded file rather than keeping a second,
+      // base64-inflated copy of the image in state.
+      setAnalysis({
+        ...result,
+        image_data: imgFile.size ? URL.createObjectURL(imgFile) : undefined
+      });
     } catch (err) {
       console.error(err);
       alert("Analysis failed. Please check your API key or file format.");
@@ -67,17 +97,30 @@ const App: React.FC = () => {
     }
   };
 
-  const handleTermClick = async (term: string) => {
+  const resetAnalysis = useCallback(() => {
+    if (analysis?.image_data) URL.revokeObjectURL(analysis.image_data);
+    setAnalysis(null);
+  }, [analysis]);
+
+  const handleTermClick = useCallback(async (term: string) => {
+    // Terms already in the notebook are shown as saved, without another model call.
+    const saved = savedTermsRef.current.find(t => normalizeTerm(t.term) === normalizeTerm(term));
+    if (saved) {
+      setSelectedTerm(saved);
+      return;
+    }
+
     setTermLoading(true);
     try {
       const explanation = await explainTerm(term);
       setSelectedTerm(explanation);
+      setExplainedTerms(prev => new Set(prev).add(normalizeTerm(term)));
     } catch (err) {
       console.error(err);
     } finally {
       setTermLoading(false);
     }
-  };
+  }, []);
 
   return (
     <div className="min-h-screen bg-gray-50 flex flex-col font-sans">
@@ -159,8 +202,9 @@ const App: React.FC = () => {
             ) : (
               <AnalysisView 
                 analysis={analysis} 
+                readyTerms={readyTerms}
                 onTermClick={handleTermClick} 
-                onReset={() => setAnalysis(null)}
+                onReset={resetAnalysis}
               />
             )}
           </div>
@@ -1,33 +1,50 @@
 
-import React from 'react';
+import React, { useMemo } from 'react';
 import { AnalysisResult } from '../types';
+import { normalizeTerm } from '../services/cache';
 
 interface Props {
   analysis: AnalysisResult;
+  readyTerms: Set<string>; // normalized terms that open without a model call
   onTermClick: (term: string) => void;
   onReset: () => void;
 }
 
-const AnalysisView: React.FC<Props> = ({ analysis, onTermClick, onReset }) => {
+const REGEX_SPECIAL_CHARS = /[.*+?^${}()|[\]\\]/g;
+const escapeRegExp = (text: string) => text.replace(REGEX_SPECIAL_CHARS, '\\$&');
+
+const AnalysisView: React.FC<Props> = ({ analysis, readyTerms, onTermClick, onReset }) => {
+
+  // Split once per analysis rather than on every render; a change to readyTerms
+  // only restyles the existing parts.
+  const parts = useMemo(() => {
+    const text = analysis.original_text;
+    if (!text) return null;
+    // A blank alternative would match between every character, so drop blanks, and
+    // skip the regex entirely when nothing is left.
+    const sortedTerms = analysis.key_terms.filter(t => t.trim()).sort((a, b) => b.length - a.length);
+    if (!sortedTerms.length) return [{ text, isTerm: false }];
+    const regex = new RegExp(`(${sortedTerms.map(escapeRegExp).join('|')})`, 'gi');
+    const terms = new Set(sortedTerms.map(t => t.toLowerCase()));
+    return text.split(regex).map(part => ({ text: part, isTerm: terms.has(part.toLowerCase()) }));
+  }, [analysis.original_text, analysis.key_terms]);
   
   /**
    * Safe text processing logic that fixes the original "innerHTML" logic error.
    * Splits text by terms and renders buttons instead of using unsafe raw HTML.
    */
-  const renderHighlightedText = (text: string, terms: string[]) => {
-    if (!text) return null;
-    const sortedTerms = [...terms].sort((a, b) => b.length - a.length);
-    const regex = new RegExp(`(${sortedTerms.map(t => t.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')).join('|')})`, 'gi');
-    const parts = text.split(regex);
+  const renderHighlightedText = () => {
+    if (!parts) return null;
 
-    return parts.map((part, i) => {
-      const isTerm = terms.some(t => t.toLowerCase() === part.toLowerCase());
+    return parts.map(({ text: part, isTerm }, i) => {
       if (isTerm) {
+        const isCached = readyTerms.has(normalizeTerm(part));
         return (
           <button
             key={i}
             onClick={() => onTermClick(part)}
-            className="px-1 py-0.5 mx-0.5 rounded bg-blue-100 text-blue-700 font-bold hover:bg-blue-200 transition-colors border-b-2 border-blue-400"
+            title={isCached ? "Explanation ready" : undefined}
+            className={`px-1 py-0.5 mx-0.5 rounded bg-blue-100 text-blue-700 font-bold hover:bg-blue-200 transition-colors border-b-2 ${isCached ? 'border-green-500' : 'border-blue-400'}`}
           >
             {part}
           </button>
@@ -54,7 +71,7 @@ const AnalysisView: React.FC<Props> = ({ analysis, onTermClick, onReset }) => {
           <div className="flex-1 overflow-y-auto prose prose-blue max-w-none text-gray-700 leading-relaxed">
             {analysis.original_text ? (
               <div className="whitespace-pre-wrap">
-                {renderHighlightedText(analysis.original_text, analysis.key_terms)}
+                {renderHighlightedText()}
               </div>
             ) : (
               <div className="h-full flex items-center justify-center italic text-gray-400">
@@ -130,4 +147,4 @@ const AnalysisView: React.FC<Props> = ({ analysis, onTermClick, onReset }) => {
   );
 };
 
-export default AnalysisView;
+export default React.memo(AnalysisView);
@@ -31,9 +31,9 @@ const Notebook: React.FC<Props> = ({ terms, onTermClick, onDelete }) => {
         </div>
       ) : (
         <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-          {terms.map((term, idx) => (
+          {terms.map(term => (
             <div 
-              key={idx}
+              key={term.term}
               className="bg-white p-6 rounded-2xl shadow-sm border border-gray-100 hover:shadow-xl hover:scale-[1.02] transition-all cursor-pointer group relative flex flex-col justify-between h-full"
               onClick={() => onTermClick(term.term)}
             >
@@ -68,4 +68,4 @@ const Notebook: React.FC<Props> = ({ terms, onTermClick, onDelete }) => {
   );
 };
 
-export default Notebook;
+export default React.memo(Notebook);
@@ -1,6 +1,7 @@
 
 import React from 'react';
 import { TermExplanation } from '../types';
+import { normalizeTerm } from '../services/cache';
 
 interface Props {
   term: TermExplanation;
@@ -10,6 +11,8 @@ interface Props {
 }
 
 const TermModal: React.FC<Props> = ({ term, onClose, onSave, isSaved }) => {
+  const isCloseMatch = !!term.requested_term && normalizeTerm(term.requested_term) !== normalizeTerm(term.term);
+
   return (
     <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
       <div className="absolute inset-0 bg-black/60 backdrop-blur-sm" onClick={onClose}></div>
@@ -28,6 +31,12 @@ const TermModal: React.FC<Props> = ({ term, onClose, onSave, isSaved }) => {
 
         {/* Content */}
         <div className="p-8 overflow-y-auto space-y-8">
+          {isCloseMatch && (
+            <p className="text-sm text-amber-800 bg-amber-50 border border-amber-100 rounded-xl px-4 py-3">
+              Showing the closest saved match for <span className="font-bold">"{term.requested_term}"</span>.
+            </p>
+          )}
+
           <section>
             <h3 className="text-xs font-bold text-blue-600 uppercase tracking-widest mb-2">Mentor's Perspective</h3>
             <p className="text-lg text-gray-700 leading-relaxed font-medium">
@@ -0,0 +1,246 @@
+
+import { TermExplanation } from "../types";
+
+const DB_NAME = 'mechmentor';
+const STORE_NAME = 'term_cache';
+// Entries used to live in localStorage under this key; cleared once on startup.
+const LEGACY_STORAGE_KEY = 'mechmentor_term_cache';
+const DEFAULT_TTL_MS = 30 * 24 * 60 * 60 * 1000;
+// Bounds both storage use and the linear similarity scan.
+const MAX_ENTRIES = 1000;
+// How long lookups wait for the store to open before running memory-only.
+const OPEN_TIMEOUT_MS = 3000;
+
+/**
+ * Cosine similarity above which two terms are treated as the same question.
+ * Set conservatively for gemini-embedding-001 SEMANTIC_SIMILARITY vectors, which
+ * score related-but-distinct short terms highly; distinctions by size or number
+ * are additionally enforced by sameSpecTokens.
+ */
+export const SIMILARITY_THRESHOLD = 0.95;
+// Words that change which physical part a term refers to.
+const SIZE_WORDS = new Set(['mini', 'micro', 'small', 'medium', 'large']);
+
+interface CacheEntry {
+  key: string;
+  vector: Float32Array | null;
+  value: TermExplanation;
+  expiresAt: number;
+  lastUsed: number;
+}
+
+/**
+ * Normalizes a term so that "Hollow Shaft " and "hollow shaft" share a key.
+ */
+export const normalizeTerm = (term: string) => term.toLowerCase().trim();
+
+/**
+ * Exact-match cache key: the normalized term itself. The store is local to this
+ * browser, so hashing would add nothing, and crypto.subtle is missing on
+ * non-secure origins such as http://<LAN-IP>:3000.
+ */
+export const cacheKey = (term: string) => normalizeTerm(term);
+
+/**
+ * Tokens that pin a term to a specific size or spec: anything containing a digit
+ * ("m3", "608zz", "5mm", "nema17") and explicit size words.
+ */
+const specTokens = (term: string) =>
+  normalizeTerm(term).split(/[\s\-_,/()]+/).filter(t => /\d/.test(t) || SIZE_WORDS.has(t)).sort().join(' ');
+
+/**
+ * Whether two terms agree on every size/number token, so "M3 screw" never
+ * resolves to the cached "M4 screw" however close their embeddings are.
+ */
+const sameSpecTokens = (a: string, b: string) => specTokens(a) === specTokens(b);
+
+const unitVector = (values: number[]) => {
+  const norm = Math.hypot(...values) || 1;
+  return Float32Array.from(values, v => v / norm);
+};
+
+const promisify = <T,>(request: IDBRequest<T>) => new Promise<T>((resolve, reject) => {
+  request.onsuccess = () => resolve(request.result);
+  request.onerror = () => reject(request.error);
+});
+
+const openDB = () => new Promise<IDBDatabase>((resolve, reject) => {
+  // Version 2 switched to SEMANTIC_SIMILARITY embeddings and version 3 to plain
+  // normalized-term keys; older records are unusable, so the store is recreated.
+  const request = indexedDB.open(DB_NAME, 3);
+  let blocked = false;
+  request.onupgradeneeded = () => {
+    const db = request.result;
+    if (db.objectStoreNames.contains(STORE_NAME)) db.deleteObjectStore(STORE_NAME);
+    db.createObjectStore(STORE_NAME, { keyPath: 'key' });
+  };
+  // Another tab still holds an older version open; don't wait for it to close.
+  request.onblocked = () => {
+    blocked = true;
+    reject(new Error("Term cache upgrade blocked by another open tab"));
+  };
+  request.onsuccess = () => {
+    // An upgrade that only went through after we gave up is closed again.
+    if (blocked) request.result.close();
+    else resolve(request.result);
+  };
+  request.onerror = () => reject(request.error);
+});
+
+/**
+ * Response cache for term explanations.
+ * Exact matches are looked up by normalized term; near-duplicates ("hollow shaft" vs
+ * "hollow shafts") are found by cosine similarity over the stored embeddings.
+ * Entries are held in memory in least-recently-used order, capped at MAX_ENTRIES,
+ * and persisted to IndexedDB, so no write blocks the main thread. If IndexedDB
+ * is unavailable the cache still works for the session.
+ */
+export class LLMCache {
+  private entries: CacheEntry[] = [];
+  private db: IDBDatabase | null = null;
+  private ready: Promise<void>;
+  private abandoned = false;
+  stats = { exactHits: 0, semanticHits: 0, misses: 0 };
+
+  constructor() {
+    // Never let a slow or stuck open hold up lookups; past the timeout the cache
+    // runs memory-only for the session.
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    const timeout = new Promise<void>(resolve => {
+      timer = setTimeout(() => {
+        this.abandoned = true;
+        resolve();
+      }, OPEN_TIMEOUT_MS);
+    });
+    this.ready = Promise.race([this.load().finally(() => clearTimeout(timer)), timeout]);
+  }
+
+  async get(key: string): Promise<TermExplanation | undefined> {
+    await this.ready;
+    const index = this.entries.findIndex(e => e.key === key && e.expiresAt > Date.now());
+    if (index < 0) return undefined;
+    this.stats.exactHits++;
+    return this.touch(index).value;
+  }
+
+  /**
+   * Normalized terms with a live entry, i.e. those an exact lookup would serve.
+   * Does not count toward hit stats or change LRU order.
+   */
+  async cachedTerms(): Promise<string[]> {
+    await this.ready;
+    const now = Date.now();
+    return this.entries.filter(e => e.expiresAt > now).map(e => e.key);
+  }
+
+  /**
+   * Returns the cached value whose embedding is most similar to `embedding`,
+   * provided the similarity exceeds SIMILARITY_THRESHOLD and the cached term
+   * carries the same size/number tokens as `term`.
+   */
+  async getSimilar(embedding: number[], term: string): Promise<TermExplanation | undefined> {
+    await this.ready;
+    const query = unitVector(embedding);
+    const now = Date.now();
+    let best = -1;
+    let bestScore = SIMILARITY_THRESHOLD;
+
+    this.entries.forEach(({ vector, value, expiresAt }, i) => {
+      if (!vector || vector.length !== query.length || expiresAt <= now) return;
+      if (!sameSpecTokens(term, value.term)) return;
+      let score = 0;
+      for (let d = 0; d < query.length; d++) score += query[d] * vector[d];
+      if (score > bestScore) {
+        bestScore = score;
+        best = i;
+      }
+    });
+
+    if (best < 0) {
+      this.stats.misses++;
+      return undefined;
+    }
+    this.stats.semanticHits++;
+    return this.touch(best).value;
+  }
+
+  async set(key: string, value: TermExplanation, ttl = DEFAULT_TTL_MS, embedding: number[] | null = null) {
+    await this.ready;
+    const index = this.entries.findIndex(e => e.key === key);
+    if (index >= 0) this.entries.splice(index, 1);
+    const now = Date.now();
+    const entry = { key, vector: embedding && unitVector(embedding), value, expiresAt: now + ttl, lastUsed: now };
+    this.entries.push(entry);
+    this.write([entry], this.prune());
+  }
+
+  /** Moves an entry to the most-recently-used end and returns it. */
+  private touch(index: number) {
+    const [entry] = this.entries.splice(index, 1);
+    entry.lastUsed = Date.now();
+    this.entries.push(entry);
+    this.write([entry]);
+    return entry;
+  }
+
+  /**
+   * Drops expired entries, then the least recently used ones beyond MAX_ENTRIES.
+   * Returns the removed keys so the caller can delete them in its own transaction.
+   */
+  private prune(): string[] {
+    const now = Date.now();
+    const expired = this.entries.filter(e => e.expiresAt <= now);
+    this.entries = this.entries.filter(e => e.expiresAt > now);
+    const evicted = this.entries.splice(0, Math.max(0, this.entries.length - MAX_ENTRIES));
+    return [...expired, ...evicted].map(e => e.key);
+  }
+
+  private async load() {
+    try {
+      localStorage.removeItem(LEGACY_STORAGE_KEY);
+      const db = await openDB();
+      const store = db.transaction(STORE_NAME, 'readonly').objectStore(STORE_NAME);
+      const entries = await promisify(store.getAll()) as CacheEntry[];
+      if (this.abandoned) {
+        // Lookups already went ahead memory-only; don't swap the store in mid-session.
+        db.close();
+        return;
+      }
+      this.db = db;
+      // The browser may close the connection (e.g. storage cleared); stop writing then.
+      db.onclose = () => { this.db = null; };
+      // Let a newer version in another tab upgrade instead of blocking it.
+      db.onversionchange = () => {
+        db.close();
+        this.db = null;
+      };
+      this.entries = entries.sort((a, b) => a.lastUsed - b.lastUsed);
+      this.write([], this.prune());
+    } catch (err) {
+      console.warn("Term cache storage unavailable; caching for this session only", err);
+    }
+  }
+
+  /**
+   * Applies all puts and deletes in a single readwrite transaction, so an insert
+   * plus its evictions commit once instead of once per record.
+   */
+  private write(puts: CacheEntry[], deletes: string[] = []) {
+    if (!this.db || (!puts.length && !deletes.length)) return;
+    // Persistence is best-effort: a failed write must never fail the lookup or
+    // discard a response that was already generated.
+    try {
+      const tx = this.db.transaction(STORE_NAME, 'readwrite');
+      const store = tx.objectStore(STORE_NAME);
+      puts.forEach(entry => store.put(entry));
+      deletes.forEach(key => store.delete(key));
+      tx.onerror = () => console.warn("Could not update term cache", tx.error);
+      // Quota failures abort the transaction without firing onerror.
+      tx.onabort = () => console.warn("Term cache update aborted", tx.error);
+    } catch (err) {
+      console.warn("Could not update term cache", err);
+    }
+  }
+}
+
+export const termCache = new LLMCache();
@@ -1,36 +1,161 @@
 
 import { GoogleGenAI, Type } from "@google/genai";
-import { AnalysisResult, TermExplanation } from "../types";
+import { AnalysisResult, DiagramLabel, TermExplanation } from "../types";
+import { cacheKey, normalizeTerm, termCache } from "./cache";
 
-const getAI = () => new GoogleGenAI({ apiKey: process.env.API_KEY });
+// One client for the whole session, so every request shares the same
+// configuration instead of rebuilding it per call.
+let client: GoogleGenAI | undefined;
+
+// How long a semantic match is reused as an exact hit for the term that found it.
+const SEMANTIC_ALIAS_TTL_MS = 60 * 60 * 1000;
+const getAI = () => client ??= new GoogleGenAI({ apiKey: process.env.API_KEY });
 
 /**
- * Robustly extracts JSON from a string that might contain markdown blocks.
- * Fixes original logic error where .replace('json', '') was used.
+ * Embeds a term for semantic cache lookup. Returns null on failure so that an
+ * embedding outage degrades to a plain cache miss instead of a failed request.
  */
-const extractJSON = (text: string) => {
-  const jsonMatch = text.match(/\{[\s\S]*\}|\[[\s\S]*\]/);
-  if (!jsonMatch) throw new Error("No valid JSON found in response");
-  return JSON.parse(jsonMatch[0]);
+const embedTerm = async (ai: GoogleGenAI, term: string): Promise<number[] | null> => {
+  try {
+    const response = await ai.models.embedContent({
+      model: 'gemini-embedding-001',
+      contents: term,
+      config: { taskType: 'SEMANTIC_SIMILARITY', outputDimensionality: 768 }
+    });
+    return response.embeddings?.[0]?.values ?? null;
+  } catch (err) {
+    console.warn("Term embedding failed; skipping semantic cache", err);
+    return null;
+  }
+};
+
+// Structured-output schemas: Gemini returns JSON conforming to these directly,
+// so responses are parsed as-is with no markdown or fence cleanup.
+const analysisSchema = {
+  type: Type.OBJECT,
+  properties: {
+    key_terms: { type: Type.ARRAY, items: { type: Type.STRING } },
+    diagram_labels: {
+      type: Type.ARRAY,
+      items: {
+        type: Type.OBJECT,
+        properties: {
+          label: { type: Type.STRING },
+          description: { type: Type.STRING },
+          box_2d: {
+            type: Type.ARRAY,
+            description: "[ymin, xmin, ymax, xmax] normalized 0-1000",
+            items: { type: Type.NUMBER },
+            minItems: '4',
+            maxItems: '4'
+          }
+        },
+        required: ['label', 'description', 'box_2d']
+      }
+    }
+  },
+  required: ['key_terms', 'diagram_labels']
+};
+
+const explanationSchema = {
+  type: Type.OBJECT,
+  properties: {
+    term: { type: Type.STRING, description: "The term exactly as given" },
+    explanation: { type: Type.STRING, description: "Detailed markdown explanation" },
+    pros: { type: Type.ARRAY, items: { type: Type.STRING } },
+    cons: { type: Type.ARRAY, items: { type: Type.STRING } },
+    alternatives: {
+      type: Type.ARRAY,
+      items: {
+        type: Type.OBJECT,
+        properties: {
+          term: { type: Type.STRING },
+          description: { type: Type.STRING }
+        },
+        required: ['term', 'description']
+      }
+    },
+    links: {
+      type: Type.ARRAY,
+      items: {
+        type: Type.OBJECT,
+        properties: {
+          title: { type: Type.STRING },
+          url: { type: Type.STRING },
+          category: { type: Type.STRING, enum: ['Image', 'Supplier', 'Community', 'Documentation'] }
+        },
+        required: ['title', 'url', 'category']
+      }
+    }
+  },
+  required: ['term', 'explanation', 'pros', 'cons', 'alternatives', 'links']
+};
+
+const parseJSON = (text?: string) => {
+  if (!text) throw new Error("Empty response from model");
+  return JSON.parse(text);
+};
+
+// Static system instructions, built once at import. Sent ahead of the per-request
+// content so every call shares an identical prefix that Gemini can cache.
+const ANALYSIS_INSTRUCTION = `
+  Act as an expert mechanical engineer.
+  Analyze the provided content and identify specific technical terms and components.
+
+  From any technical text, identify key mechanical components, materials, and hardware terms.
+
+  From any image, identify distinct mechanical components.
+  For each component, provide:
+  1. Unique technical label (no duplicates).
+  2. Functional description.
+  3. Precise bounding box [ymin, xmin, ymax, xmax] normalized 0-1000.
+`;
+
+const EXPLAIN_INSTRUCTION = `
+  Act as an AI Mechanical Mentor for a robotics beginner.
+  Explain the term the user gives you.
+  Focus on deep conceptual understanding: why it's used and how it's designed.
+  List its advantages and tradeoffs, alternatives worth exploring, and supplier,
+  community, or documentation links.
+`;
+
+/**
+ * Keeps only labels whose box is exactly four numbers; AnalysisView destructures
+ * [ymin, xmin, ymax, xmax] and would draw NaN shapes from anything else.
+ */
+const validLabels = (labels: DiagramLabel[]) => labels.filter(l =>
+  Array.isArray(l.box_2d) && l.box_2d.length === 4 && l.box_2d.every(n => Number.isFinite(n))
+);
+
+/**
+ * Removes blank entries and case/whitespace duplicates while keeping the model's
+ * original order.
+ */
+const dedupeBy = <T,>(items: T[], name: (item: T) => string) => {
+  const seen = new Map<string, T>();
+  items.forEach(item => {
+    const key = normalizeTerm(name(item));
+    if (key && !seen.has(key)) seen.set(key, item);
+  });
+  return [...seen.values()];
 };
 
 export const analyzeContent = async (
   text?: string,
   image?: { data: string; mimeType: string }
 ): Promise<AnalysisResult> => {
-  const ai = getAI();
-  const model = ai.models.get('gemini-3-pro-preview');
+  // A blank or whitespace-only document has nothing to analyze; without a diagram
+  // there is no reason to call the model at all.
+  const hasText = !!text?.trim();
+  if (!hasText && !image) {
+    return { key_terms: [], diagram_labels: [], original_text: text };
+  }
 
+  const ai = getAI();
   const promptParts: any[] = [];
-  
-  let instructions = `
-    Act as an expert mechanical engineer. 
-    Analyze the provided content and identify specific technical terms and components.
-  `;
 
-  if (text) {
+  if (hasText) {
     promptParts.push({ text: `Analyze this technical text:\n${text}` });
-    instructions += `\nIdentify key mechanical components, materials, and hardware terms from the text.`;
   }
 
   if (image) {
@@ -40,59 +165,58 @@ export const analyzeContent = async (
         mimeType: image.mimeType,
       },
     });
-    instructions += `
-      \nFrom the image, identify distinct mechanical components.
-      For each component, provide:
-      1. Unique technical label (no duplicates).
-      2. Functional description.
-      3. Precise bounding box [ymin, xmin, ymax, xmax] normalized 0-1000.
-    `;
   }
 
-  instructions += `
-    Output ONLY a JSON object with this schema:
-    {
-      "key_terms": string[],
-      "diagram_labels": [{"label": string, "description": string, "box_2d": [number, number, number, number]}]
+  const response = await ai.models.generateContent({
+    model: 'gemini-3-pro-preview',
+    contents: [{ role: 'user', parts: promptParts }],
+    config: {
+      systemInstruction: ANALYSIS_INSTRUCTION,
+      responseMimeType: "application/json",
+      responseSchema: analysisSchema
     }
-  `;
-
-  const response = await model.generateContent({
-    contents: [{ role: 'user', parts: [...promptParts, { text: instructions }] }],
-    config: { responseMimeType: "application/json" }
   });
 
-  const result = extractJSON(response.text || "");
+  // Text and diagram share one request, so a single-input call still gets both fields
+  // back from the static schema; keep only what the inputs can actually support.
+  const result = parseJSON(response.text);
+  const key_terms = dedupeBy<string>(result.key_terms ?? [], t => t);
   return {
-    ...result,
-    original_text: text,
-    image_data: image ? `data:${image.mimeType};base64,${image.data}` : undefined
+    key_terms,
+    diagram_labels: image ? dedupeBy<DiagramLabel>(validLabels(result.diagram_labels ?? []), l => l.label) : [],
+    original_text: text
   };
 };
 
 export const explainTerm = async (term: string): Promise<TermExplanation> => {
+  const key = cacheKey(term);
+  const exact = await termCache.get(key);
+  if (exact) return { ...exact, timestamp: Date.now() };
+
   const ai = getAI();
-  const model = ai.models.get('gemini-3-flash-preview');
-
-  const prompt = `
-    Act as an AI Mechanical Mentor for a robotics beginner.
-    Explain the term: "${term}".
-    Focus on deep conceptual understanding: why it's used and how it's designed.
-    
-    Output strictly valid JSON:
-    {
-      "term": "${term}",
-      "explanation": "Detailed markdown explanation",
-      "pros": ["advantage 1", "advantage 2"],
-      "cons": ["tradeoff 1", "tradeoff 2"],
-      "alternatives": [{"term": "name", "description": "why"}],
-      "links": [{"title": "Shop/Read", "url": "URL", "category": "Supplier|Community|Image"}]
-    }
-  `;
+  const embedding = await embedTerm(ai, term);
+  const similar = embedding && await termCache.getSimilar(embedding, term);
+  if (similar) {
+    // The match is flagged so the UI can say which term it actually explains, and
+    // aliased under this term only briefly, so a false positive cannot stick.
+    const match = { ...similar, requested_term: term };
+    await termCache.set(key, match, SEMANTIC_ALIAS_TTL_MS, embedding);
+    return { ...match, timestamp: Date.now() };
+  }
 
-  const response = await model.generateContent(prompt);
-  return {
-    ...extractJSON(response.text || ""),
+  const response = await ai.models.generateContent({
+    model: 'gemini-3-flash-preview',
+    contents: `Explain the term: "${term}".`,
+    config: {
+      systemInstruction: EXPLAIN_INSTRUCTION,
+      responseMimeType: "application/json",
+      responseSchema: explanationSchema
+    }
+  });
+  const explanation: TermExplanation = {
+    ...parseJSON(response.text),
     timestamp: Date.now()
   };
+  await termCache.set(key, explanation, undefined, embedding);
+  return explanation;
 };
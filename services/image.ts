@@ -0,0 +1,43 @@
+
+import { canSendAsIs, needsMainThread, processImage, readAsBase64 } from "./imageCodec";
+
+type PreparedImage = { data: string; mimeType: string };
+
+// Workers get OffscreenCanvas but no DOM, so they can only encode where it exists.
+const canUseWorker = () => typeof Worker !== 'undefined' && typeof OffscreenCanvas !== 'undefined';
+
+const processInWorker = (file: File) => new Promise<PreparedImage>((resolve, reject) => {
+  const worker = new Worker(new URL('./imageWorker.ts', import.meta.url), { type: 'module' });
+  worker.onmessage = (e: MessageEvent<{ image?: PreparedImage; error?: string }>) => {
+    worker.terminate();
+    if (e.data.image) resolve(e.data.image);
+    else reject(new Error(e.data.error));
+  };
+  worker.onerror = (e) => {
+    worker.terminate();
+    reject(new Error(e.message));
+  };
+  worker.postMessage(file);
+});
+
+/**
+ * Prepares an uploaded diagram for Gemini.
+ * Small files in formats Gemini reads natively are sent byte-for-byte without
+ * decoding. Anything else is decoded, downscaled and re-encoded as needed in a
+ * Web Worker, so large photos do not stall the UI; if the worker cannot start,
+ * the same work runs on the main thread. SVGs are rasterized on the main thread,
+ * since that needs an <img> element.
+ */
+export const prepareImage = async (file: File): Promise<PreparedImage> => {
+  if (canSendAsIs(file)) {
+    return { data: await readAsBase64(file), mimeType: file.type };
+  }
+  if (canUseWorker() && !needsMainThread(file)) {
+    try {
+      return await processInWorker(file);
+    } catch (err) {
+      console.warn("Image worker failed; processing on the main thread", err);
+    }
+  }
+  return processImage(file);
+};
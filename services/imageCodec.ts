@@ -0,0 +1,132 @@
+
+// Image formats Gemini accepts as inline data; anything else must be converted.
+const SUPPORTED_MIME_TYPES = new Set([
+  'image/png',
+  'image/jpeg',
+  'image/webp',
+  'image/heic',
+  'image/heif',
+]);
+
+const JPEG_QUALITY = 0.85;
+// Gemini tiles images internally; pixels beyond this edge length add upload size
+// and billed image tokens without improving the analysis.
+const MAX_EDGE = 1568;
+// Below this size an upload is sent as-is; decoding it just to measure its
+// dimensions would cost more than downscaling could save.
+const SMALL_FILE_BYTES = 512 * 1024;
+const SVG_MIME_TYPE = 'image/svg+xml';
+// Raster size for SVGs that declare no intrinsic width/height.
+const SVG_FALLBACK_EDGE = 1024;
+
+export const readAsBase64 = (blob: Blob) => new Promise<string>((resolve, reject) => {
+  const reader = new FileReader();
+  reader.onload = () => {
+    const dataUrl = reader.result as string;
+    resolve(dataUrl.slice(dataUrl.indexOf(',') + 1));
+  };
+  reader.onerror = () => reject(reader.error);
+  reader.readAsDataURL(blob);
+});
+
+/**
+ * Draws a bitmap onto a canvas at the given size and encodes it as JPEG.
+ * OffscreenCanvas is used where available: it encodes asynchronously without a
+ * DOM element and lets the browser use its accelerated raster path.
+ */
+const encodeJpeg = async (bitmap: ImageBitmap, width: number, height: number): Promise<Blob> => {
+  const draw = (ctx: CanvasRenderingContext2D | OffscreenCanvasRenderingContext2D | null) => {
+    if (!ctx) throw new Error("Canvas 2D context unavailable");
+    // JPEG has no alpha channel; flatten transparent areas onto white.
+    ctx.fillStyle = '#fff';
+    ctx.fillRect(0, 0, width, height);
+    ctx.imageSmoothingQuality = 'high';
+    ctx.drawImage(bitmap, 0, 0, width, height);
+  };
+
+  if (typeof OffscreenCanvas !== 'undefined') {
+    const canvas = new OffscreenCanvas(width, height);
+    draw(canvas.getContext('2d'));
+    return canvas.convertToBlob({ type: 'image/jpeg', quality: JPEG_QUALITY });
+  }
+
+  const canvas = document.createElement('canvas');
+  canvas.width = width;
+  canvas.height = height;
+  draw(canvas.getContext('2d'));
+  return new Promise((resolve, reject) => {
+    canvas.toBlob(
+      blob => blob ? resolve(blob) : reject(new Error("JPEG encoding failed")),
+      'image/jpeg',
+      JPEG_QUALITY
+    );
+  });
+};
+
+/**
+ * createImageBitmap rejects SVG Blobs in Chromium and Firefox, so SVGs are
+ * rasterized through an <img> and a canvas instead. Needs the DOM, so this only
+ * runs on the main thread.
+ */
+const rasterizeSvg = async (file: File): Promise<ImageBitmap> => {
+  const url = URL.createObjectURL(file);
+  try {
+    const img = new Image();
+    img.src = url;
+    await img.decode();
+    const canvas = document.createElement('canvas');
+    canvas.width = img.naturalWidth || SVG_FALLBACK_EDGE;
+    canvas.height = img.naturalHeight || SVG_FALLBACK_EDGE;
+    const ctx = canvas.getContext('2d');
+    if (!ctx) throw new Error("Canvas 2D context unavailable");
+    ctx.drawImage(img, 0, 0, canvas.width, canvas.height);
+    return await createImageBitmap(canvas);
+  } finally {
+    URL.revokeObjectURL(url);
+  }
+};
+
+/** Whether decoding this file needs the DOM, which Web Workers lack. */
+export const needsMainThread = (file: File) => file.type === SVG_MIME_TYPE;
+
+/**
+ * Whether a file can be sent to Gemini byte-for-byte without being decoded:
+ * small files in formats Gemini reads natively.
+ */
+export const canSendAsIs = (file: File) =>
+  SUPPORTED_MIME_TYPES.has(file.type) && file.size <= SMALL_FILE_BYTES;
+
+/**
+ * Decodes a diagram and, if needed, re-encodes it for Gemini. It is re-encoded as
+ * JPEG only if its format is unsupported or its longest edge exceeds MAX_EDGE, in
+ * which case it is also scaled down. Bounding boxes are normalized, so
+ * downscaling does not affect them.
+ */
+export const processImage = async (file: File): Promise<{ data: string; mimeType: string }> => {
+  const supported = SUPPORTED_MIME_TYPES.has(file.type);
+
+  let bitmap: ImageBitmap;
+  try {
+    bitmap = needsMainThread(file) ? await rasterizeSvg(file) : await createImageBitmap(file);
+  } catch (err) {
+    // Browsers without a HEIC/HEIF decoder can still forward the original bytes.
+    if (supported) return { data: await readAsBase64(file), mimeType: file.type };
+    throw err;
+  }
+
+  try {
+    const scale = Math.min(1, MAX_EDGE / Math.max(bitmap.width, bitmap.height));
+    if (supported && scale === 1) {
+      return { data: await readAsBase64(file), mimeType: file.type };
+    }
+    const jpeg = await encodeJpeg(
+      bitmap,
+      // Very long strips could otherwise round their short edge to 0 px.
+      Math.max(1, Math.round(bitmap.width * scale)),
+      Math.max(1, Math.round(bitmap.height * scale))
+    );
+    return { data: await readAsBase64(jpeg), mimeType: 'image/jpeg' };
+  } finally {
+    bitmap.close();
+  }
+};
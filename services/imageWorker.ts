@@ -0,0 +1,13 @@
+
+import { processImage } from "./imageCodec";
+
+// Worker entry point: decodes, downscales and encodes one diagram off the UI thread.
+const scope = self as unknown as Worker;
+
+scope.onmessage = async (e: MessageEvent<File>) => {
+  try {
+    scope.postMessage({ image: await processImage(e.data) });
+  } catch (err) {
+    scope.postMessage({ error: err instanceof Error ? err.message : String(err) });
+  }
+};
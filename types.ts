@@ -18,6 +18,7 @@ export interface TermExplanation {
   alternatives: Alternative[];
   links: Link[];
   timestamp: number;
+  requested_term?: string; // set when a similar cached term answered this request
 }
 
 export interface DiagramLabel {